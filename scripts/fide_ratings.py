@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Import the official FIDE rating list into a local indexed store and look players up.
+Usage:
+  python scripts/fide_ratings.py import <players_list.zip|.xml|.txt> [--month 2026-10] [--db ratings/fide_ratings.sqlite3]
+  python scripts/fide_ratings.py lookup <fide_id or name> [--fed LBN] [--db ratings/fide_ratings.sqlite3]
+
+The download (XML or TXT, zipped or not) is streamed record by record, so memory stays
+constant for the full ~1M player list. Players are stored in SQLite keyed by FIDE ID,
+with an index on the normalized name (same normalization as the standings). Importing a
+newer month only rewrites players whose data changed.
+"""
+
+import argparse
+import io
+import sqlite3
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+from process_crosstable import normalize_player_key
+
+
+DEFAULT_DB = "ratings/fide_ratings.sqlite3"
+
+# Rows are written in batches inside a single transaction
+BATCH_SIZE = 5000
+
+FIELDS = ("fide_id", "name", "name_key", "federation", "sex", "title",
+          "rating", "rapid_rating", "blitz_rating", "birth_year")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    fide_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    federation TEXT,
+    sex TEXT,
+    title TEXT,
+    rating INTEGER,
+    rapid_rating INTEGER,
+    blitz_rating INTEGER,
+    birth_year INTEGER,
+    updated_month TEXT
+);
+CREATE INDEX IF NOT EXISTS players_name_key ON players (name_key);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Columns of the TXT list, in header order ("Tit" must be found before "WTit")
+TXT_COLUMNS = [
+    ("ID Number", "fide_id"), ("Name", "name"), ("Fed", "federation"), ("Sex", "sex"),
+    ("Tit", "title"), ("WTit", "w_title"), ("OTit", None), ("FOA", None),
+    ("SRtng", "rating"), ("SGm", None), ("SK", None),
+    ("RRtng", "rapid_rating"), ("RGm", None), ("Rk", None),
+    ("BRtng", "blitz_rating"), ("BGm", None), ("BK", None),
+    ("B-day", "birth_year"), ("Flag", None),
+]
+
+
+def to_int(value: str | None) -> int | None:
+    """Parse an integer field, treating blanks and zeros as missing."""
+    value = (value or "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else None
+
+
+def make_row(record: dict) -> tuple | None:
+    """Build a players row from raw list fields; None when there is no FIDE ID or name."""
+    fide_id = to_int(record.get("fide_id"))
+    name = (record.get("name") or "").strip()
+    if fide_id is None or not name:
+        return None
+    title = (record.get("title") or "").strip() or (record.get("w_title") or "").strip()
+    return (
+        fide_id,
+        name,
+        normalize_player_key(name),
+        (record.get("federation") or "").strip(),
+        (record.get("sex") or "").strip(),
+        title,
+        to_int(record.get("rating")),
+        to_int(record.get("rapid_rating")),
+        to_int(record.get("blitz_rating")),
+        to_int(record.get("birth_year")),
+    )
+
+
+def iter_xml_players(stream):
+    """Yield rows from the XML list with iterparse, clearing parsed elements as we go."""
+    context = ET.iterparse(stream, events=("start", "end"))
+    _, root = next(context)
+    tags = {"fideid": "fide_id", "name": "name", "country": "federation", "sex": "sex",
+            "title": "title", "w_title": "w_title", "rating": "rating",
+            "rapid_rating": "rapid_rating", "blitz_rating": "blitz_rating", "birthday": "birth_year"}
+    for event, elem in context:
+        if event != "end" or elem.tag != "player":
+            continue
+        record = {tags[child.tag]: child.text for child in elem if child.tag in tags}
+        row = make_row(record)
+        if row:
+            yield row
+        elem.clear()
+        root.clear()
+
+
+def iter_txt_players(stream):
+    """Yield rows from the fixed-width TXT list; column offsets come from the header line."""
+    header = stream.readline()
+    spans = []
+    pos = 0
+    for label, field in TXT_COLUMNS:
+        start = header.find(label, pos)
+        if start < 0:
+            continue
+        spans.append((start, field))
+        pos = start + len(label)
+    columns = [(start, spans[i + 1][0] if i + 1 < len(spans) else None, field)
+               for i, (start, field) in enumerate(spans) if field]
+    if not any(field == "fide_id" for _, _, field in columns):
+        raise ValueError("Unrecognized TXT rating list header")
+
+    for line in stream:
+        record = {field: line[start:end] for start, end, field in columns}
+        row = make_row(record)
+        if row:
+            yield row
+
+
+def open_rating_list(path: str):
+    """Open a downloaded list (optionally zipped) and return (text or binary stream, format)."""
+    if zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        member = next(n for n in archive.namelist() if n.lower().endswith((".xml", ".txt")))
+        raw = archive.open(member)
+        suffix = Path(member).suffix.lower()
+    else:
+        raw = open(path, "rb")
+        suffix = Path(path).suffix.lower()
+    if suffix == ".xml":
+        return raw, "xml"
+    return io.TextIOWrapper(raw, encoding="utf-8", errors="replace"), "txt"
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open (and create if needed) the ratings store."""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def import_rating_list(list_path: str, db_path: str = DEFAULT_DB, month: str | None = None,
+                       force: bool = False) -> dict:
+    """
+    Stream a FIDE rating list into the store.
+
+    Rows are upserted by FIDE ID; existing players are only rewritten when one of
+    their fields changed, so a monthly refresh touches just the updated players.
+    Players missing from the new list are kept. Returns import statistics.
+    """
+    month = month or datetime.now().strftime("%Y-%m")
+    conn = connect(db_path)
+    current = conn.execute("SELECT value FROM meta WHERE key = 'list_month'").fetchone()
+    if current and current[0] == month and not force:
+        conn.close()
+        return {"month": month, "read": 0, "changed": 0, "skipped": True}
+
+    columns = ", ".join(FIELDS)
+    placeholders = ", ".join("?" for _ in FIELDS)
+    updates = ", ".join(f"{f} = excluded.{f}" for f in FIELDS[1:])
+    differs = " OR ".join(f"{f} IS NOT excluded.{f}" for f in FIELDS[1:])
+    upsert = (f"INSERT INTO players ({columns}, updated_month) VALUES ({placeholders}, ?) "
+              f"ON CONFLICT (fide_id) DO UPDATE SET {updates}, updated_month = excluded.updated_month "
+              f"WHERE {differs}")
+
+    stream, fmt = open_rating_list(list_path)
+    rows = iter_xml_players(stream) if fmt == "xml" else iter_txt_players(stream)
+    read = 0
+    before = conn.total_changes
+    with stream, conn:
+        batch = []
+        for row in rows:
+            batch.append((*row, month))
+            if len(batch) >= BATCH_SIZE:
+                conn.executemany(upsert, batch)
+                read += len(batch)
+                batch = []
+        conn.executemany(upsert, batch)
+        read += len(batch)
+        changed = conn.total_changes - before
+        conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+            ("list_month", month),
+            ("source", Path(list_path).name),
+            ("imported_at", datetime.now().isoformat()),
+        ])
+    stats = {"month": month, "read": read, "changed": changed, "skipped": False}
+    conn.close()
+    return stats
+
+
+class RatingStore:
+    """Read-only lookups against the local FIDE ratings store."""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        if not Path(db_path).exists():
+            raise FileNotFoundError(f"Ratings store not found: {db_path} (run 'fide_ratings.py import' first)")
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def by_id(self, fide_id: int) -> dict | None:
+        """Player with this FIDE ID, or None."""
+        row = self.conn.execute("SELECT * FROM players WHERE fide_id = ?", (fide_id,)).fetchone()
+        return dict(row) if row else None
+
+    def by_name(self, name: str, federation: str | None = None) -> dict | None:
+        """Player with this normalized name; None if unknown or ambiguous.
+
+        When a federation is given, only players of that federation can match.
+        """
+        rows = self.conn.execute("SELECT * FROM players WHERE name_key = ?",
+                                 (normalize_player_key(name),)).fetchall()
+        if federation:
+            rows = [r for r in rows if r["federation"] == federation]
+        return dict(rows[0]) if len(rows) == 1 else None
+
+    def lookup(self, fide_id: int | None = None, name: str | None = None,
+               federation: str | None = None) -> dict | None:
+        """Find a player by FIDE ID, falling back to the name.
+
+        The returned entry has "match" set to "id" or "name"; name matches are
+        low-confidence and should not be trusted for ratings or titles.
+        """
+        if fide_id:
+            player = self.by_id(fide_id)
+            if player:
+                return {**player, "match": "id"}
+        player = self.by_name(name, federation) if name else None
+        return {**player, "match": "name"} if player else None
+
+    def list_month(self) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'list_month'").fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=DEFAULT_DB, help="Path to the ratings store")
+
+    parser = argparse.ArgumentParser(description="Local FIDE rating list store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", parents=[common],
+                         help="Import a downloaded FIDE rating list (XML/TXT, zipped or not)")
+    imp.add_argument("list_file", help="Path to players_list_xml.zip, players_list.zip, .xml or .txt")
+    imp.add_argument("--month", help="Rating list month as YYYY-MM (default: current month)")
+    imp.add_argument("--force", action="store_true", help="Re-import even if this month is already loaded")
+
+    look = sub.add_parser("lookup", parents=[common], help="Look up a player by FIDE ID or name")
+    look.add_argument("query", help="FIDE ID or player name")
+    look.add_argument("--fed", help="Only match players of this federation")
+
+    args = parser.parse_args()
+
+    if args.command == "import":
+        stats = import_rating_list(args.list_file, args.db, args.month, args.force)
+        if stats["skipped"]:
+            print(f"Rating list {stats['month']} already imported into {args.db} (use --force to reload)")
+        else:
+            print(f"Imported {stats['read']} players ({stats['changed']} new or changed) "
+                  f"for {stats['month']} into {args.db}")
+        return 0
+
+    if not Path(args.db).exists():
+        print(f"Ratings store not found: {args.db} (run 'fide_ratings.py import' first)")
+        return 1
+    with RatingStore(args.db) as store:
+        query = args.query.strip()
+        player = store.lookup(fide_id=int(query)) if query.isdigit() else store.lookup(name=query, federation=args.fed)
+        if not player:
+            print("No unique match found")
+            return 1
+        print(f"{player['fide_id']}  {player['title'] or '-':4} {player['name']} ({player['federation']})  "
+              f"std {player['rating'] or '-'}  rapid {player['rapid_rating'] or '-'}  blitz {player['blitz_rating'] or '-'}"
+              f"{'  (matched by name)' if player['match'] == 'name' else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
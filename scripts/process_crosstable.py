@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 """
 Process Chess-Results crosstables and calculate circuit points.
-Usage: python scripts/process_crosstable.py <xlsx_file> <event_type> [--output-dir data]
+Usage: python scripts/process_crosstable.py <crosstable_file> <event_type> [--output-dir data]
+
+Supported crosstable formats (chosen by file extension):
+  .xlsx        Chess-Results Excel export (needs pandas + openpyxl)
+  .trf / .txt  FIDE Tournament Report File, as exported by the pairing software
+  .csv         Plain CSV crosstable (see parse_csv_crosstable)
 """
 
 import argparse
+import bisect
+import csv
 import json
 import math
 import os
@@ -12,8 +19,6 @@ import re
 from datetime import datetime
 from pathlib import Path
 
-import pandas as pd
-
 
 # Circuit Points Configuration
 PLACEMENT_POINTS = {
@@ -66,6 +71,9 @@ MIN_COMPLETION_RATIO = 0.5  # Must complete at least 50% of rounds
 
 def parse_crosstable(xlsx_path: str) -> dict:
     """Parse a Chess-Results crosstable Excel file."""
+    # Imported lazily so the TRF/CSV importers work without the Excel stack
+    import pandas as pd
+
     df = pd.read_excel(xlsx_path, header=None)
     
     # Extract tournament info from header rows
@@ -80,6 +88,11 @@ def parse_crosstable(xlsx_path: str) -> dict:
             date_match = re.search(r"(\d{4}/\d{2}/\d{2})", cell)
             if date_match:
                 tournament_info["date"] = date_match.group(1).replace("/", "-")
+        elif cell.startswith("Last update"):
+            # When Chess-Results last changed the results; stands in for the results date
+            last_update = parse_date(cell)
+            if last_update:
+                tournament_info["last_update"] = last_update
         elif "Number of rounds" in cell:
             rounds_match = re.search(r"(\d+)", cell)
             if rounds_match:
@@ -125,22 +138,28 @@ def parse_crosstable(xlsx_path: str) -> dict:
             columns["points"] = i
         elif col_str == "Rk.":
             columns["final_rank"] = i
+        elif col_str in ("FideID", "FIDE-ID", "ID"):
+            columns["fide_id"] = i
 
     if "seed_rank" not in columns and use_rk_format:
         columns["seed_rank"] = None  # will be derived from rating order
 
     # Find round columns: "1.Rd", "2.Rd", ... (Swiss) or plain 1, 2, 3, ... (round-robin)
+    # In round-robin tables the column number is the opponent's No. (or Rk.), not the round.
     round_cols = []
+    round_robin = False
     for i, col in enumerate(header):
         col_str = str(col).strip() if pd.notna(col) else ""
         if re.match(r"\d+\.Rd", col_str):
             round_cols.append(i)
         elif col_str.isdigit() and 1 <= int(col_str) <= 20:
             round_cols.append(i)
+            round_robin = True
     columns["rounds"] = round_cols
 
     # Parse player data
     players = []
+    raw_rounds = {}  # No. (or Rk.) -> [(round, opponent_no, color, result)]
     data_start = header_row + 1
 
     for idx in range(data_start, len(df)):
@@ -179,10 +198,21 @@ def parse_crosstable(xlsx_path: str) -> dict:
         # Count any non-empty result: 0 = loss, 1 = win, ½ = draw, * = bye (all count as round completed)
         rounds_played = 0
         total_rounds = len(round_cols)
-        for rc in round_cols:
+        entries = []
+        for n, rc in enumerate(round_cols, 1):
             rd_val = str(row.iloc[rc]).strip() if pd.notna(row.iloc[rc]) else ""
             if rd_val:
                 rounds_played += 1
+            if round_robin:
+                if rd_val in RESULT_ALIASES:
+                    entries.append((None, n, None, RESULT_ALIASES[rd_val]))
+            elif (cell := parse_round_cell(rd_val)) is not None:
+                entries.append((n, *cell))
+        try:
+            start_no = int(float(row.iloc[columns["seed_rank"]])) if columns["seed_rank"] is not None else final_rank
+        except (ValueError, TypeError):
+            start_no = final_rank
+        raw_rounds[start_no] = entries
 
         completed = rounds_played >= total_rounds
 
@@ -198,18 +228,352 @@ def parse_crosstable(xlsx_path: str) -> dict:
             "total_rounds": total_rounds,
             "completed": completed,
         })
+        if "fide_id" in columns and str(fide_val := row.iloc[columns["fide_id"]]).strip().split(".")[0].isdigit():
+            players[-1]["fide_id"] = int(float(fide_val))
+
+    # Round data is best effort for Excel exports: cells that don't parse are skipped
+    for player, rounds in zip(players, resolve_opponents(players, raw_rounds, strict=False)):
+        player["rounds"] = rounds
 
     # Always derive seed_rank from rating order (1 = highest rating), not from crosstable No. column.
     # Chess-Results starting rank can be wrong; we use the crosstable for rating data but rank by that.
-    # Competition ranking ("1224"): players with equal ratings share the best rank of their tie
-    # group, so ties (notably all unrated players at rating 0) are never broken alphabetically.
-    if players:
-        by_rating = sorted(players, key=lambda p: -p["rating"])
-        for i, p in enumerate(by_rating, 1):
-            if i > 1 and p["rating"] == by_rating[i - 2]["rating"]:
-                p["seed_rank"] = by_rating[i - 2]["seed_rank"]
-            else:
-                p["seed_rank"] = i
+    assign_seed_ranks(players)
+
+    return {
+        "tournament": tournament_info,
+        "players": players,
+        "total_players": len(players),
+    }
+
+
+def assign_seed_ranks(players: list) -> None:
+    """Set seed_rank on each player from rating order (1 = highest rating).
+
+    Competition ranking ("1224"): players with equal ratings share the best rank of their tie
+    group, so ties (notably all unrated players at rating 0) are never broken alphabetically.
+    """
+    by_rating = sorted(players, key=lambda p: -p["rating"])
+    for i, p in enumerate(by_rating, 1):
+        if i > 1 and p["rating"] == by_rating[i - 2]["rating"]:
+            p["seed_rank"] = by_rating[i - 2]["seed_rank"]
+        else:
+            p["seed_rank"] = i
+
+
+# Round results in player records: "1", "½", "0" for played games, "+" / "-" for forfeits.
+# Byes have opponent None and carry the points awarded ("1", "½" or "0").
+RESULT_ALIASES = {
+    "1": "1",
+    "½": "½",
+    "=": "½",
+    "1/2": "½",
+    "0.5": "½",
+    "0": "0",
+    "+": "+",
+    "-": "-",
+}
+
+# FIDE TRF result codes -> (result, has opponent)
+TRF_RESULT_CODES = {
+    "1": ("1", True),
+    "=": ("½", True),
+    "0": ("0", True),
+    "W": ("1", True),   # win, not rated
+    "D": ("½", True),   # draw, not rated
+    "L": ("0", True),   # loss, not rated
+    "+": ("+", True),   # forfeit win
+    "-": ("-", True),   # forfeit loss
+    "F": ("1", False),  # full-point bye
+    "U": ("1", False),  # pairing-allocated bye
+    "H": ("½", False),  # half-point bye
+    "Z": ("0", False),  # zero-point bye (absent)
+}
+
+# Older TRF files use lowercase title codes
+TRF_TITLES = {
+    "g": "GM", "m": "IM", "f": "FM", "c": "CM",
+    "wg": "WGM", "wm": "WIM", "wf": "WFM", "wc": "WCM",
+}
+
+
+def parse_date(value: str) -> str | None:
+    """Normalize 'YYYY/MM/DD', 'YYYY-MM-DD', 'YYYY.MM.DD' or 'DD.MM.YYYY' to 'YYYY-MM-DD'."""
+    m = re.search(r"(\d{4})[/.-](\d{1,2})[/.-](\d{1,2})", value)
+    if m:
+        return f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"
+    m = re.search(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})", value)
+    if m:
+        return f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}"
+    return None
+
+
+def parse_round_cell(value: str) -> tuple | None:
+    """Parse a Chess-Results style round cell into (opponent_no, color, result).
+
+    Games look like "12w1", "7b½" or "3=" (opponent start number, colour, result);
+    byes have no opponent ("1", "-½"). Round-robin cells are just the result.
+    Returns None for empty, "*" or unparseable cells.
+    """
+    value = value.strip().lower().replace(" ", "")
+    m = CSV_ROUND_CELL.match(value)
+    if not m:
+        return None
+    opp_no = int(m.group(1)) if m.group(1) else None
+    result = RESULT_ALIASES[m.group(3)]
+    if opp_no is None:
+        # A bye: forfeit markers just carry the points
+        if result in ("+", "-"):
+            result = "1" if result == "+" else "0"
+        return None, None, result
+    return opp_no, m.group(2) or None, result
+
+
+def resolve_opponents(players: list, raw_rounds: dict, strict: bool = True) -> list:
+    """Turn (round, opponent_no, color, result) entries into round dicts with opponent names.
+
+    raw_rounds maps each player's start number to their entries, in the same order as
+    players. Unknown opponent numbers raise ValueError, or are dropped when not strict.
+    Returns one list of rounds per player.
+    """
+    names = {no: p["name"] for no, p in zip(raw_rounds, players)}
+    all_rounds = []
+    for entries, player in zip(raw_rounds.values(), players):
+        rounds = []
+        for rnd, opp_no, color, result in entries:
+            opponent = None
+            if opp_no is not None:
+                if opp_no not in names:
+                    if strict:
+                        raise ValueError(f"{player['name']}: unknown opponent no. {opp_no} in round {rnd}")
+                    continue
+                opponent = names[opp_no]
+            rounds.append({"round": rnd, "opponent": opponent, "color": color, "result": result})
+        all_rounds.append(rounds)
+    return all_rounds
+
+
+def finalize_players(players: list, raw_rounds: dict, total_rounds: int) -> None:
+    """Resolve opponent start numbers to names and fill in round/completion fields.
+
+    raw_rounds maps a player's start number to a list of (round, opponent_no, color, result).
+    """
+    for player, rounds in zip(players, resolve_opponents(players, raw_rounds)):
+        # Same completion rule as the Excel path: every recorded round counts,
+        # including byes and forfeits; only rounds left blank do not
+        rounds_played = len(rounds)
+        player["rounds_played"] = rounds_played
+        player["total_rounds"] = total_rounds
+        player["completed"] = rounds_played >= total_rounds
+        player["rounds"] = rounds
+
+    assign_seed_ranks(players)
+
+
+# Encodings tried in order for TRF files; pairing programs often write cp1252 (Latin-1)
+TRF_ENCODINGS = ("utf-8-sig", "cp1252", "latin-1")
+
+
+def read_trf_lines(trf_path: str) -> list:
+    """Read a TRF file's lines with the first encoding in TRF_ENCODINGS that decodes it."""
+    data = Path(trf_path).read_bytes()
+    for encoding in TRF_ENCODINGS:
+        try:
+            return data.decode(encoding).splitlines()
+        except UnicodeDecodeError:
+            continue
+
+
+def parse_trf(trf_path: str) -> dict:
+    """Parse a FIDE Tournament Report File (TRF16) line by line.
+
+    Only the header records (012 name, 022 city, 042 start date, XXR rounds) and
+    the fixed-width 001 player records are read; everything else is skipped.
+    The file is read as UTF-8, falling back to cp1252 (see TRF_ENCODINGS).
+    """
+    tournament_info = {}
+    players = []
+    raw_rounds = {}  # start number -> [(round, opponent_no, color, result)]
+    max_round = 0
+
+    for line in read_trf_lines(trf_path):
+        code = line[:3]
+        value = line[4:].strip()
+
+        if code == "012":
+            tournament_info["name"] = value
+        elif code == "022":
+            tournament_info["location"] = value
+        elif code == "042":
+            date = parse_date(value)
+            if date:
+                tournament_info["date"] = date
+        elif code == "XXR":
+            rounds_match = re.search(r"(\d+)", value)
+            if rounds_match:
+                tournament_info["rounds"] = int(rounds_match.group(1))
+        elif code == "001":
+            line = line.rstrip("\r\n").ljust(91)
+            start_no = int(line[4:8])
+            if start_no in raw_rounds:
+                raise ValueError(f"TRF player {start_no} appears twice")
+            title = line[10:13].strip()
+            rating = line[48:52].strip()
+            points = line[80:84].strip()
+            rank = line[85:89].strip()
+            if not rank.isdigit():
+                raise ValueError(f"TRF player {start_no} has no final rank")
+
+            entries = []
+            for i, base in enumerate(range(91, len(line), 10), 1):
+                opp = line[base:base + 4].strip()
+                color = line[base + 5:base + 6].strip().lower()
+                code_char = line[base + 7:base + 8]
+                if code_char.strip() == "":
+                    continue
+                if code_char not in TRF_RESULT_CODES:
+                    raise ValueError(f"TRF player {start_no}: unknown result code {code_char!r} in round {i}")
+                result, has_opponent = TRF_RESULT_CODES[code_char]
+                opp_no = int(opp) if has_opponent and opp.isdigit() and int(opp) > 0 else None
+                entries.append((i, opp_no, color if opp_no is not None and color in ("w", "b") else None, result))
+                max_round = max(max_round, i)
+
+            players.append({
+                "seed_rank": None,
+                "name": line[14:47].strip(),
+                "title": TRF_TITLES.get(title, title.upper()),
+                "rating": int(rating) if rating.isdigit() else 0,
+                "federation": line[53:56].strip(),
+                "points": float(points) if points else 0,
+                "final_rank": int(rank),
+            })
+            fide_id = line[57:68].strip()
+            if fide_id.isdigit() and int(fide_id) > 0:
+                players[-1]["fide_id"] = int(fide_id)
+            raw_rounds[start_no] = entries
+
+    if not players:
+        raise ValueError(f"No TRF player (001) records found in {trf_path}")
+    total_rounds = tournament_info.get("rounds", max_round)
+    tournament_info.setdefault("rounds", total_rounds)
+    finalize_players(players, raw_rounds, total_rounds)
+
+    return {
+        "tournament": tournament_info,
+        "players": players,
+        "total_players": len(players),
+    }
+
+
+# CSV header aliases (compared lowercased, without trailing dots)
+CSV_COLUMNS = {
+    "final_rank": ("rk", "rank"),
+    "start_no": ("no", "snr", "start"),
+    "title": ("title", "tit"),
+    "name": ("name",),
+    "rating": ("rtg", "rating", "elo"),
+    "federation": ("fed", "federation"),
+    "points": ("pts", "points"),
+    "fide_id": ("id", "fideid", "fide id", "fide-id", "fide_id"),
+}
+
+# Round cell: "<opponent no.><w|b><result>", e.g. "12w1", "7b½", "3=" ; byes have no opponent, e.g. "1", "-½"
+CSV_ROUND_CELL = re.compile(r"^(?:-|bye)?(\d*)([wb]?)(1/2|0\.5|½|=|1|0|\+|-)$")
+
+
+def parse_csv_crosstable(csv_path: str) -> dict:
+    """Parse a plain CSV crosstable.
+
+    Leading '# key: value' lines set tournament info (name, date, location, rounds).
+    The header row needs at least Name and Pts columns; Rk, No, Title, Rtg, FED and
+    FIDE ID are optional, and round columns are named 1, 2, ... (also "R1" or "1.Rd"). Rows are
+    streamed; when Rk is missing the row order is taken as the final ranking, and
+    when No is missing opponents are referenced by row number.
+    """
+    tournament_info = {}
+
+    def data_lines(f):
+        for line in f:
+            if line.startswith("#"):
+                key, _, value = line[1:].partition(":")
+                key, value = key.strip().lower(), value.strip()
+                if key == "date":
+                    value = parse_date(value) or value
+                elif key == "rounds" and value.isdigit():
+                    value = int(value)
+                if key in ("name", "date", "location", "rounds"):
+                    tournament_info[key] = value
+            elif line.strip():
+                yield line
+
+    players = []
+    raw_rounds = {}
+
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(data_lines(f))
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV crosstable is empty")
+
+        columns = {}
+        round_cols = []
+        for i, col in enumerate(header):
+            col_key = col.strip().lower().rstrip(".").strip()
+            round_match = re.fullmatch(r"(?:r|rd|round)?\s*(\d+)(?:\.\s*rd)?", col_key)
+            if round_match:
+                round_cols.append((int(round_match.group(1)), i))
+                continue
+            for field, aliases in CSV_COLUMNS.items():
+                if col_key in aliases:
+                    columns[field] = i
+        if "name" not in columns or "points" not in columns:
+            raise ValueError("CSV crosstable needs at least 'Name' and 'Pts' columns")
+
+        def cell(row, field, default=""):
+            i = columns.get(field)
+            return row[i].strip() if i is not None and i < len(row) else default
+
+        for row_no, row in enumerate(reader, 1):
+            name = cell(row, "name")
+            if not name:
+                continue
+            rank = cell(row, "final_rank")
+            start_no = cell(row, "start_no")
+            rating = cell(row, "rating")
+            points = cell(row, "points").replace(",", ".")
+            if points.endswith("½"):
+                points = str(int(points[:-1] or 0) + 0.5)
+
+            entries = []
+            for rnd, i in round_cols:
+                value = row[i].strip() if i < len(row) else ""
+                if not value:
+                    continue
+                parsed = parse_round_cell(value)
+                if parsed is None:
+                    raise ValueError(f"{name}: cannot parse round {rnd} result {value!r}")
+                entries.append((rnd, *parsed))
+
+            players.append({
+                "seed_rank": None,
+                "name": name,
+                "title": cell(row, "title"),
+                "rating": int(float(rating)) if re.fullmatch(r"\d+(\.\d+)?", rating) else 0,
+                "federation": cell(row, "federation"),
+                "points": float(points) if points else 0,
+                "final_rank": int(rank) if rank.isdigit() else row_no,
+            })
+            if (fide_id := cell(row, "fide_id")).isdigit() and int(fide_id) > 0:
+                players[-1]["fide_id"] = int(fide_id)
+            start_no = int(start_no) if start_no.isdigit() else row_no
+            if start_no in raw_rounds:
+                raise ValueError(f"{name}: duplicate start number {start_no}")
+            raw_rounds[start_no] = entries
+
+    if not players:
+        raise ValueError(f"No player rows found in CSV crosstable {csv_path}")
+    total_rounds = tournament_info.get("rounds", len(round_cols))
+    tournament_info.setdefault("rounds", total_rounds)
+    finalize_players(players, raw_rounds, total_rounds)
 
     return {
         "tournament": tournament_info,
@@ -218,6 +582,23 @@ def parse_crosstable(xlsx_path: str) -> dict:
     }
 
 
+# Crosstable parsers by file extension
+CROSSTABLE_PARSERS = {
+    ".xlsx": parse_crosstable,
+    ".trf": parse_trf,
+    ".txt": parse_trf,
+    ".csv": parse_csv_crosstable,
+}
+
+
+def load_crosstable(path: str) -> dict:
+    """Parse a crosstable file with the parser matching its extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix not in CROSSTABLE_PARSERS:
+        raise ValueError(f"Unsupported crosstable format '{suffix}' (expected one of {', '.join(CROSSTABLE_PARSERS)})")
+    return CROSSTABLE_PARSERS[suffix](path)
+
+
 def get_placement_points(event_type: str, final_rank: int, total_players: int) -> int:
     """Calculate placement points based on event type and final rank."""
     if event_type in ["group_a", "group_b"]:
@@ -319,9 +700,57 @@ def calculate_circuit_points(player: dict, event_type: str, total_players: int)
     }
 
 
-def process_event(xlsx_path: str, event_type: str) -> dict:
-    """Process a crosstable and calculate all circuit points."""
-    data = parse_crosstable(xlsx_path)
+def apply_rating_list(players: list, store, event_type: str) -> int:
+    """
+    Add FIDE rating list data from the local store (fide_ratings.RatingStore).
+
+    Only FIDE IDs from the crosstable are trusted. Those players get any missing title
+    and their list rating as "list_rating" (rapid for rapid events, standard otherwise).
+    Players unrated in the crosstable are then seeded by that list rating
+    ("rating_source": "list"); a crosstable rating is the rating at the event and is
+    never replaced. The list is the store's month, not the event's, so use a current
+    list for events just played rather than reprocessing old ones.
+
+    Players without a known ID are looked up by name within their federation. Such a
+    match may be a namesake, so its ID is only kept as "fide_id_guess" for organizers
+    to confirm; it never becomes fide_id and is not used for identity.
+    Returns the number of players matched by FIDE ID.
+    """
+    matched = 0
+    reseed = False
+    for player in players:
+        player.update(list_rating=None, fide_id_guess=None, rating_source="crosstable")
+        entry = store.lookup(fide_id=player.get("fide_id"), name=player["name"],
+                             federation=player["federation"] or None)
+        if not entry:
+            continue
+        if entry["match"] == "name":
+            player["fide_id_guess"] = entry["fide_id"]
+            continue
+        matched += 1
+        if not player["title"] and entry["title"]:
+            player["title"] = entry["title"]
+        player["list_rating"] = entry["rapid_rating"] if event_type == "rapid" else entry["rating"]
+        if not player["rating"] and player["list_rating"]:
+            player["rating"] = player["list_rating"]
+            player["rating_source"] = "list"
+            reseed = True
+    if reseed:
+        assign_seed_ranks(players)
+    return matched
+
+
+def process_event(crosstable_path: str, event_type: str, columnar: bool = False, ratings=None) -> dict:
+    """Process a crosstable and calculate all circuit points.
+
+    With columnar=True the event is returned in the columnar v2 layout
+    (see encode_event_columns). With a ratings store (fide_ratings.RatingStore),
+    players are matched against the local FIDE rating list first (see apply_rating_list).
+    """
+    data = load_crosstable(crosstable_path)
+    if ratings is not None:
+        apply_rating_list(data["players"], ratings, event_type)
+        data["tournament"]["rating_list_month"] = ratings.list_month()
     
     total_players = data["total_players"]
     
@@ -337,9 +766,9 @@ def process_event(xlsx_path: str, event_type: str) -> dict:
     results.sort(key=lambda x: (-x["circuit_points"]["total"], x["final_rank"]))
     
     # Create event ID from filename
-    event_id = Path(xlsx_path).stem
+    event_id = Path(crosstable_path).stem
     
-    return {
+    event = {
         "event_id": event_id,
         "event_type": event_type,
         "tournament": data["tournament"],
@@ -347,6 +776,90 @@ def process_event(xlsx_path: str, event_type: str) -> dict:
         "results": results,
         "processed_at": datetime.now().isoformat(),
     }
+    return encode_event_columns(event) if columnar else event
+
+
+# Columnar ("v2") event layout: one array per result field instead of one object per
+# player. Low-cardinality strings are dictionary encoded (the column holds indexes into
+# "dictionaries"), and round opponents are stored as indexes into the result rows.
+EVENT_SCHEMA_VERSION = 2
+COLUMNAR_DICTIONARY_FIELDS = ("title", "federation", "rating_source", "percentile_band", "eligibility_reason")
+
+
+def encode_event_columns(event: dict) -> dict:
+    """Convert a row-oriented event dict into the columnar v2 layout."""
+    results = event["results"]
+    dictionaries = {}
+
+    def column(values: list, field: str) -> list:
+        if field not in COLUMNAR_DICTIONARY_FIELDS:
+            return values
+        entries = dictionaries.setdefault(field, [])
+        lookup = {value: i for i, value in enumerate(entries)}
+        encoded = []
+        for value in values:
+            if value is None:
+                encoded.append(None)
+                continue
+            if value not in lookup:
+                lookup[value] = len(entries)
+                entries.append(value)
+            encoded.append(lookup[value])
+        return encoded
+
+    # Union of keys in first-seen order: optional fields (fide_id, ...) may be missing on the first row
+    fields = [f for f in dict.fromkeys(k for r in results for k in r) if f not in ("circuit_points", "rounds")]
+    point_fields = list(results[0]["circuit_points"]) if results else []
+    columns = {f: column([r.get(f) for r in results], f) for f in fields}
+    columns["circuit_points"] = {
+        f: column([r["circuit_points"].get(f) for r in results], f) for f in point_fields
+    }
+    if any("rounds" in r for r in results):
+        row_of = {r["name"]: i for i, r in enumerate(results)}
+        columns["rounds"] = [
+            [[rd["round"], row_of.get(rd["opponent"]), rd["color"], rd["result"]] for rd in r.get("rounds", [])]
+            for r in results
+        ]
+
+    encoded = {k: v for k, v in event.items() if k != "results"}
+    encoded["schema_version"] = EVENT_SCHEMA_VERSION
+    encoded["dictionaries"] = dictionaries
+    encoded["columns"] = columns
+    return encoded
+
+
+def decode_event_columns(event: dict) -> dict:
+    """Return the row-oriented event dict for either layout (v1 events pass through)."""
+    if event.get("schema_version") != EVENT_SCHEMA_VERSION:
+        return event
+
+    dictionaries = event["dictionaries"]
+    columns = event["columns"]
+
+    def values(column: list, field: str) -> list:
+        if field not in dictionaries:
+            return column
+        entries = dictionaries[field]
+        return [None if v is None else entries[v] for v in column]
+
+    fields = {f: values(c, f) for f, c in columns.items() if f not in ("circuit_points", "rounds")}
+    point_fields = {f: values(c, f) for f, c in columns["circuit_points"].items()}
+    results = []
+    for i in range(event["total_players"]):
+        result = {f: c[i] for f, c in fields.items()}
+        result["circuit_points"] = {f: c[i] for f, c in point_fields.items()}
+        results.append(result)
+    if "rounds" in columns:
+        names = fields["name"]
+        for result, rounds in zip(results, columns["rounds"]):
+            result["rounds"] = [
+                {"round": rnd, "opponent": None if opp is None else names[opp], "color": color, "result": res}
+                for rnd, opp, color, res in rounds
+            ]
+
+    decoded = {k: v for k, v in event.items() if k not in ("schema_version", "dictionaries", "columns")}
+    decoded["results"] = results
+    return decoded
 
 
 def get_event_category(event_type: str) -> str:
@@ -366,9 +879,202 @@ def normalize_player_key(name: str) -> str:
     return key
 
 
+def player_slug(name: str) -> str:
+    """File-safe player id derived from normalize_player_key (used for head-to-head shards)."""
+    return re.sub(r"[^\w]+", "-", normalize_player_key(name)).strip("-")
+
+
+def load_events(data_dir: str) -> list:
+    """Read every event JSON in data_dir/events (either layout), in file name order."""
+    events = []
+    for event_file in sorted((Path(data_dir) / "events").glob("*.json")):
+        with open(event_file) as f:
+            events.append(decode_event_columns(json.load(f)))
+    return events
+
+
+def resolve_player_identities(events: list) -> dict:
+    """
+    Map every normalized player name in the events to its player_id.
+
+    Names recorded with the same FIDE ID in any event are one player, even when spelled
+    differently. Only crosstable IDs are stored as fide_id (name matches against the
+    rating list stay in fide_id_guess), so a namesake never merges two players. A player's id is the slug of the smallest name key in their group, so
+    it does not depend on the order the events are read. Standings, head-to-head and
+    the standings history all use this mapping.
+    """
+    parent = {}  # name key -> smaller name key of the same player (union-find)
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    fide_keys = {}  # fide_id -> a name key seen with it
+    for event in events:
+        for result in event["results"]:
+            key = normalize_player_key(result["name"])
+            parent.setdefault(key, key)
+            if fide_id := result.get("fide_id"):
+                root, other = find(key), find(fide_keys.setdefault(fide_id, key))
+                if root != other:
+                    parent[max(root, other)] = min(root, other)
+    return {key: player_slug(find(key)) for key in parent}
+
+
+def player_id_of(name: str, identities: dict) -> str:
+    """player_id for a name, falling back to its slug for names not in identities."""
+    return identities.get(normalize_player_key(name)) or player_slug(name)
+
+
+# Head-to-head shard layout: one JSON per player in data/head_to_head/<player_id>.json
+#   {"name": ..., "opponents": {<player_id>: {"name", "w", "d", "l", "white", "black", "games"}}}
+# where games are [event_id, round, color, result] from the shard owner's point of view.
+# _index.json holds {"events": {event_id: [player_ids]}, "identities": {name_key: player_id}}:
+# the players with games in each event, so reprocessing an event only touches their
+# shards, and the merged identities (names whose id is not their own slug) the shards
+# were built with. When those change, every shard is rebuilt.
+HEAD_TO_HEAD_DIR = "head_to_head"
+
+
+def extract_games(event: dict, identities: dict | None = None) -> list:
+    """List each game of an event once as (white_name, black_name, white_result, round, colored).
+
+    Both players' rows describe the same game, so games are deduplicated per round and
+    unordered pair of players (by player_id, see resolve_player_identities). The colour
+    is taken from whichever side recorded it; when neither did (round-robin Excel
+    exports) the first player in id order takes the "white" slot and colored is False.
+    Byes and forfeits are skipped.
+    """
+    identities = identities or {}
+    flipped = {"1": "0", "0": "1", "½": "½"}
+    games = {}
+    for result in event["results"]:
+        name = result["name"]
+        for rnd in result.get("rounds", []):
+            opponent = rnd["opponent"]
+            if opponent is None or rnd["result"] not in ("1", "½", "0"):
+                continue
+            ids = (player_id_of(name, identities), player_id_of(opponent, identities))
+            if rnd["color"] == "w" or (rnd["color"] is None and ids[0] < ids[1]):
+                game = (name, opponent, rnd["result"], rnd["round"], rnd["color"] is not None)
+            else:
+                game = (opponent, name, flipped[rnd["result"]], rnd["round"], rnd["color"] is not None)
+            key = (rnd["round"], frozenset(ids))
+            if key not in games or (game[4] and not games[key][4]):
+                games[key] = game
+    return list(games.values())
+
+
+def summarize_opponent(record: dict) -> None:
+    """Recompute the win/draw/loss and colour counters from the game list."""
+    games = record["games"]
+    record["w"] = sum(1 for g in games if g[3] == "1")
+    record["d"] = sum(1 for g in games if g[3] == "½")
+    record["l"] = sum(1 for g in games if g[3] == "0")
+    record["white"] = sum(1 for g in games if g[2] == "w")
+    record["black"] = sum(1 for g in games if g[2] == "b")
+
+
+def merge_head_to_head_event(h2h_dir: Path, index_events: dict, event: dict, identities: dict) -> int:
+    """Replace one event's games in the shards of its (old and new) players; returns the game count."""
+    event_id = event["event_id"]
+    flipped = {"1": "0", "0": "1", "½": "½"}
+    additions = {}  # player_id -> (name, [(opponent_id, opponent_name, game)])
+    games = extract_games(event, identities)
+    for white, black, result, rnd, colored in games:
+        w_id, b_id = player_id_of(white, identities), player_id_of(black, identities)
+        additions.setdefault(w_id, (white, []))[1].append(
+            (b_id, black, [event_id, rnd, "w" if colored else None, result]))
+        additions.setdefault(b_id, (black, []))[1].append(
+            (w_id, white, [event_id, rnd, "b" if colored else None, flipped[result]]))
+
+    for player_id in set(index_events.get(event_id, [])) | set(additions):
+        shard_file = h2h_dir / f"{player_id}.json"
+        shard = {"name": None, "opponents": {}}
+        if shard_file.exists():
+            with open(shard_file) as f:
+                shard = json.load(f)
+
+        # Drop this event's old games, then add the new ones
+        for record in shard["opponents"].values():
+            record["games"] = [g for g in record["games"] if g[0] != event_id]
+        if player_id in additions:
+            name, entries = additions[player_id]
+            shard["name"] = shard["name"] or name
+            if "," in name and "," not in shard["name"]:
+                shard["name"] = name
+            for opp_id, opp_name, game in entries:
+                record = shard["opponents"].setdefault(opp_id, {"name": opp_name, "games": []})
+                if "," in opp_name and "," not in record["name"]:
+                    record["name"] = opp_name
+                record["games"].append(game)
+
+        shard["opponents"] = {k: v for k, v in shard["opponents"].items() if v["games"]}
+        if not shard["opponents"]:
+            shard_file.unlink(missing_ok=True)
+            continue
+        for record in shard["opponents"].values():
+            summarize_opponent(record)
+        with open(shard_file, "w") as f:
+            json.dump(shard, f, ensure_ascii=False, separators=(",", ":"))
+
+    if additions:
+        index_events[event_id] = sorted(additions)
+    else:
+        index_events.pop(event_id, None)
+    return len(games)
+
+
+def update_head_to_head(data_dir: str, event: dict) -> int:
+    """
+    Merge one event's games into the per-player head-to-head shards.
+
+    Player identities are resolved over all events in data_dir plus this one. Games
+    previously stored for the same event_id are replaced, so reprocessing an event is
+    idempotent; only the shards of players in the old or new version of the event are
+    read and written. If the event changes the merged identities (e.g. a new FIDE ID
+    links two spellings), all shards are rebuilt. Returns the number of games stored
+    for the event.
+    """
+    event = decode_event_columns(event)
+    events = [e for e in load_events(data_dir) if e["event_id"] != event["event_id"]] + [event]
+    identities = resolve_player_identities(events)
+    merged = {key: pid for key, pid in sorted(identities.items()) if pid != player_slug(key)}
+
+    h2h_dir = Path(data_dir) / HEAD_TO_HEAD_DIR
+    h2h_dir.mkdir(parents=True, exist_ok=True)
+    index_file = h2h_dir / "_index.json"
+    index = {"events": {}, "identities": {}}
+    if index_file.exists():
+        with open(index_file) as f:
+            index = json.load(f)
+        if "events" not in index:
+            # Older flat layout: {event_id: [slugs]}
+            index = {"events": index, "identities": {}}
+
+    if index["identities"] != merged:
+        for shard_file in h2h_dir.glob("*.json"):
+            if shard_file != index_file:
+                shard_file.unlink()
+        index = {"events": {}, "identities": merged}
+        for other in events[:-1]:
+            merge_head_to_head_event(h2h_dir, index["events"], other, identities)
+    games = merge_head_to_head_event(h2h_dir, index["events"], event, identities)
+
+    with open(index_file, "w") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    return games
+
+
 # Maximum number of events to count per category (rolling best-N)
 MAX_EVENTS_PER_CATEGORY = 3
 
+# Circuit qualification spots used by the clinch/elimination analysis
+# (overridden by "qualification_spots" in crosstables/events.json)
+DEFAULT_QUALIFICATION_SPOTS = 1
+
 
 def calculate_best_n_points(events: list, max_events: int = MAX_EVENTS_PER_CATEGORY) -> tuple:
     """
@@ -396,74 +1102,212 @@ def calculate_best_n_points(events: list, max_events: int = MAX_EVENTS_PER_CATEG
     return total, events_with_status
 
 
-def update_standings(data_dir: str) -> dict:
+def max_event_points(event_type: str) -> int:
+    """Most circuit points a single event of this type can award."""
+    if event_type in PLACEMENT_POINTS:
+        placement = max(PLACEMENT_POINTS[event_type].values())
+        bonus = PERFORMANCE_CAPS[event_type]
+    else:
+        bands = PERCENTILE_BANDS_RAPID if event_type == "rapid" else PERCENTILE_BANDS_GROUP_C
+        placement = bands[0][1]
+        bonus = min(PERFORMANCE_CAPS[event_type], math.floor(0.5 * placement))
+    return placement + bonus + PARTICIPATION_POINTS[event_type]
+
+
+def load_schedule(schedule_file: str) -> dict | None:
+    """Read the season schedule (upcoming events, qualification spots) from events.json.
+
+    Returns None when the file is missing or has no "upcoming" list, in which case
+    the clinch/elimination analysis is skipped.
+    """
+    path = Path(schedule_file)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        config = json.load(f)
+    if "upcoming" not in config:
+        return None
+    return {
+        "upcoming": config["upcoming"],
+        "qualification_spots": config.get("qualification_spots", DEFAULT_QUALIFICATION_SPOTS),
+    }
+
+
+def analyze_race(standings: list, upcoming: list, qualification_spots: int, identities: dict | None = None) -> dict:
+    """
+    Compute clinch / elimination status for each player (standings must be sorted).
+
+    A player's ceiling is their current total plus the most their remaining events can
+    add to their best-3 in each category. An upcoming event with a "players" list
+    (names, matched through identities) only counts for those players, e.g. the
+    invitation round-robins Group A and B once their lineup is known; an event without
+    one is assumed open to everyone, so ceilings are upper bounds. Players not yet in
+    the standings are rivals too: each listed newcomer, plus K unknown entrants who can
+    play every open event. Totals never go down under best-N, so the current total is
+    the floor. With K qualification spots:
+      - clinched:   fewer than K other players can reach or pass the player's current total
+      - eliminated: at least K other players are already above the player's ceiling
+    Both checks use sorted floors/ceilings and binary search, O(n log n) overall.
+    points_to_clinch is None when clinching is out of the player's own reach.
+    Adds a "race" dict to each player and returns the season-level summary.
+    """
+    identities = identities or {}
+    # (category, max points, eligible player_ids or None when open to everyone)
+    remaining = []
+    for event in upcoming:
+        eligible = event.get("players")
+        if eligible is not None:
+            eligible = {player_id_of(name, identities) for name in eligible}
+        remaining.append((get_event_category(event["type"]), max_event_points(event["type"]), eligible))
+
+    def ceiling_of(player_id: str | None, events: list) -> int:
+        ceiling = 0
+        for category in ("rapid", "classical"):
+            scores = [e["points"] for e in events if e["category"] == category]
+            scores += [most for c, most, eligible in remaining
+                       if c == category and (eligible is None or player_id in eligible)]
+            ceiling += sum(sorted(scores, reverse=True)[:MAX_EVENTS_PER_CATEGORY])
+        return ceiling
+
+    ceilings = [ceiling_of(p.get("player_id"), p["events"]) for p in standings]
+
+    k = qualification_spots
+    known = {p.get("player_id") for p in standings}
+    newcomers = {pid for _, _, eligible in remaining if eligible for pid in eligible} - known
+    rival_ceilings = ceilings + [ceiling_of(pid, []) for pid in sorted(newcomers)]
+    if any(eligible is None for _, _, eligible in remaining):
+        rival_ceilings += [ceiling_of(None, [])] * k
+
+    floors_asc = sorted(p["total_points"] for p in standings)
+    by_ceiling = sorted(range(len(rival_ceilings)), key=lambda i: -rival_ceilings[i])
+    ceiling_rank = {i: r for r, i in enumerate(by_ceiling)}
+    ceilings_desc = [rival_ceilings[i] for i in by_ceiling]
+    leader_total = standings[0]["total_points"] if standings else 0
+
+    for i, player in enumerate(standings):
+        total = player["total_points"]
+
+        # K-th highest ceiling among the *other* players: to clinch, the player
+        # must get strictly above it.
+        rival_index = k if ceiling_rank[i] < k else k - 1
+        if rival_index < len(ceilings_desc):
+            points_to_clinch = max(0, ceilings_desc[rival_index] + 1 - total)
+        else:
+            points_to_clinch = 0
+
+        # Other players already above this player's ceiling
+        locked_above = len(floors_asc) - bisect.bisect_right(floors_asc, ceilings[i])
+
+        if points_to_clinch == 0:
+            status = "clinched"
+        elif locked_above >= k:
+            status = "eliminated"
+        else:
+            status = "contention"
+
+        # None when the player cannot clinch, i.e. the target is above their own ceiling
+        can_clinch = status != "eliminated" and total + points_to_clinch <= ceilings[i]
+        player["race"] = {
+            "max_points": ceilings[i],
+            "status": status,
+            "points_to_clinch": points_to_clinch if can_clinch else None,
+            "points_to_overtake": standings[i - 1]["total_points"] - total + 1 if i > 0 else 0,
+            "points_to_leader": leader_total - total + 1 if i > 0 else 0,
+            "can_catch_leader": i == 0 or ceilings[i] > leader_total,
+        }
+
+    return {
+        "qualification_spots": k,
+        "upcoming_events": len(upcoming),
+        "clinched": sum(1 for p in standings if p["race"]["status"] == "clinched"),
+        "eliminated": sum(1 for p in standings if p["race"]["status"] == "eliminated"),
+    }
+
+
+def update_standings(data_dir: str, schedule: dict | None = None) -> dict:
     """
     Aggregate all event results into overall standings.
     
     Uses a rolling best-3 system: for each player, only their top 3 Rapid 
     scores and top 3 Classical scores are counted toward the circuit total.
+    Players are grouped by resolve_player_identities, so name variants sharing a
+    FIDE ID count as one player. When a schedule (see load_schedule) is given, each
+    player also gets clinch/elimination data from analyze_race.
     """
-    events_dir = Path(data_dir) / "events"
-    if not events_dir.exists():
-        return {"players": [], "events": []}
+    events = load_events(data_dir)
+    if not events:
+        return {"standings": [], "events": [], "updated_at": datetime.now().isoformat()}
+    identities = resolve_player_identities(events)
     
-    # Load all event files
     all_events = []
-    player_data = {}  # normalized_key -> player info with categorized events
+    player_data = {}  # player_id -> player info with categorized events
     
-    for event_file in events_dir.glob("*.json"):
-        with open(event_file) as f:
-            event = json.load(f)
-            event_type = event["event_type"]
-            category = get_event_category(event_type)
+    for event in events:
+        event_type = event["event_type"]
+        category = get_event_category(event_type)
+        
+        all_events.append({
+            "event_id": event["event_id"],
+            "event_type": event_type,
+            "category": category,
+            "name": event["tournament"].get("name", event["event_id"]),
+            "date": event["tournament"].get("date", ""),
+            "results_date": event["tournament"].get("last_update") or event["tournament"].get("date", ""),
+            "total_players": event["total_players"],
+        })
+        
+        for result in event["results"]:
+            name = result["name"]
+            key = player_id_of(name, identities)
+            fide_id = result.get("fide_id")
+            if key not in player_data:
+                player_data[key] = {
+                    "player_id": key,
+                    "name": name,
+                    "title": result.get("title", ""),
+                    "rating": result.get("rating", 0),
+                    "federation": result.get("federation", ""),
+                    "fide_id": fide_id,
+                    "list_rating": None,
+                    "list_rating_date": "",
+                    "rapid_events": [],
+                    "classical_events": [],
+                }
+            else:
+                # Prefer "Last, First" (FIDE-style) for display when we see it
+                if "," in name and "," not in player_data[key]["name"]:
+                    player_data[key]["name"] = name
+            
+            # Update rating if higher (might have changed between events)
+            if result.get("rating", 0) > player_data[key]["rating"]:
+                player_data[key]["rating"] = result["rating"]
+            
+            if fide_id and not player_data[key]["fide_id"]:
+                player_data[key]["fide_id"] = fide_id
+            
+            # Keep the FIDE list rating from the most recent event that has one
+            results_date = all_events[-1]["results_date"]
+            if result.get("list_rating") and results_date >= player_data[key]["list_rating_date"]:
+                player_data[key]["list_rating"] = result["list_rating"]
+                player_data[key]["list_rating_date"] = results_date
             
-            all_events.append({
+            # Update title if present
+            if result.get("title") and not player_data[key]["title"]:
+                player_data[key]["title"] = result["title"]
+            
+            event_entry = {
                 "event_id": event["event_id"],
                 "event_type": event_type,
                 "category": category,
-                "name": event["tournament"].get("name", event["event_id"]),
-                "date": event["tournament"].get("date", ""),
-                "total_players": event["total_players"],
-            })
+                "final_rank": result["final_rank"],
+                "points": result["circuit_points"]["total"],
+            }
             
-            for result in event["results"]:
-                name = result["name"]
-                key = normalize_player_key(name)
-                if key not in player_data:
-                    player_data[key] = {
-                        "name": name,
-                        "title": result.get("title", ""),
-                        "rating": result.get("rating", 0),
-                        "federation": result.get("federation", ""),
-                        "rapid_events": [],
-                        "classical_events": [],
-                    }
-                else:
-                    # Prefer "Last, First" (FIDE-style) for display when we see it
-                    if "," in name and "," not in player_data[key]["name"]:
-                        player_data[key]["name"] = name
-                
-                # Update rating if higher (might have changed between events)
-                if result.get("rating", 0) > player_data[key]["rating"]:
-                    player_data[key]["rating"] = result["rating"]
-                
-                # Update title if present
-                if result.get("title") and not player_data[key]["title"]:
-                    player_data[key]["title"] = result["title"]
-                
-                event_entry = {
-                    "event_id": event["event_id"],
-                    "event_type": event_type,
-                    "category": category,
-                    "final_rank": result["final_rank"],
-                    "points": result["circuit_points"]["total"],
-                }
-                
-                # Add to appropriate category
-                if category == "rapid":
-                    player_data[key]["rapid_events"].append(event_entry)
-                else:
-                    player_data[key]["classical_events"].append(event_entry)
+            # Add to appropriate category
+            if category == "rapid":
+                player_data[key]["rapid_events"].append(event_entry)
+            else:
+                player_data[key]["classical_events"].append(event_entry)
     
     # Calculate standings with best-3 system
     standings = []
@@ -479,10 +1323,13 @@ def update_standings(data_dir: str) -> dict:
         counted_events = [e for e in all_player_events if e.get("counted", True)]
         
         standings.append({
+            "player_id": data["player_id"],
             "name": data["name"],
             "title": data["title"],
             "rating": data["rating"],
             "federation": data["federation"],
+            "fide_id": data["fide_id"],
+            "list_rating": data["list_rating"],
             "events": all_player_events,
             "rapid_points": rapid_total,
             "classical_points": classical_total,
@@ -498,24 +1345,145 @@ def update_standings(data_dir: str) -> dict:
     for i, player in enumerate(standings, 1):
         player["position"] = i
     
-    return {
+    result = {
         "standings": standings,
         "events": sorted(all_events, key=lambda x: x.get("date", ""), reverse=True),
         "updated_at": datetime.now().isoformat(),
     }
+    if schedule is not None:
+        result["race"] = analyze_race(standings, schedule["upcoming"], schedule["qualification_spots"], identities)
+    return result
+
+
+# Standings history (data/standings_history.json), delta encoded:
+#   {"snapshots": [{"seq", "taken_at", "as_of", "events_added", "changes", "removed"}]}
+# "taken_at" is when the snapshot was built; "as_of" is the results date of the newest
+# event it adds (of the newest event overall for corrections), i.e. when these
+# standings were current, which is the time axis for points-over-time charts.
+# "changes" maps player_id -> [total_points, position] for players that are new or
+# whose points or position changed since the previous snapshot; "removed" lists
+# player_ids that dropped out. Replaying the deltas rebuilds any snapshot.
+STANDINGS_HISTORY_FILE = "standings_history.json"
+
+
+def load_standings_history(data_dir: str) -> dict:
+    """Read the standings history, or an empty one if none exists yet."""
+    history_file = Path(data_dir) / STANDINGS_HISTORY_FILE
+    if not history_file.exists():
+        return {"snapshots": []}
+    with open(history_file) as f:
+        return json.load(f)
+
+
+def replay_history(snapshots: list) -> tuple:
+    """
+    Apply snapshot deltas in order.
+
+    Returns (state, events, previous_state) where state maps player_id ->
+    [total_points, position] after the last snapshot, events is the set of event_ids
+    seen so far and previous_state is the state one snapshot earlier.
+    """
+    state, previous, events = {}, {}, set()
+    for snapshot in snapshots:
+        previous = dict(state)
+        for player_id in snapshot.get("removed", []):
+            state.pop(player_id, None)
+        state.update(snapshot["changes"])
+        events.update(snapshot.get("events_added", []))
+    return state, events, previous
+
+
+def reconstruct_standings_snapshot(data_dir: str, seq: int) -> dict:
+    """Rebuild the {player_id: [total_points, position]} map as of snapshot seq."""
+    snapshots = load_standings_history(data_dir)["snapshots"]
+    state, _, _ = replay_history([s for s in snapshots if s["seq"] <= seq])
+    return state
+
+
+def record_standings_snapshot(data_dir: str, standings: dict) -> dict | None:
+    """
+    Append a delta snapshot for these standings and add movement fields.
+
+    Each player gets position_change (positive = moved up, None for new players)
+    and points_change, measured against the last snapshot that differs from the
+    current standings, so rebuilding unchanged standings keeps the arrows. Nothing
+    is appended when the standings have not changed. Returns the new snapshot.
+    """
+    history = load_standings_history(data_dir)
+    snapshots = history["snapshots"]
+    state, seen_events, previous = replay_history(snapshots)
+
+    current = {p["player_id"]: [p["total_points"], p["position"]] for p in standings["standings"]}
+    changes = {pid: entry for pid, entry in current.items() if state.get(pid) != entry}
+    removed = sorted(pid for pid in state if pid not in current)
+    event_ids = [e["event_id"] for e in standings["events"]]
+
+    added = set(event_ids) - seen_events
+    dates = [e.get("results_date") for e in standings["events"] if e["event_id"] in added or not added]
+
+    snapshot = None
+    if changes or removed:
+        snapshot = {
+            "seq": snapshots[-1]["seq"] + 1 if snapshots else 1,
+            "taken_at": standings["updated_at"],
+            "as_of": max(filter(None, dates), default=None),
+            "events_added": sorted(added),
+            "changes": changes,
+            "removed": removed,
+        }
+        snapshots.append(snapshot)
+        baseline = state
+        with open(Path(data_dir) / STANDINGS_HISTORY_FILE, "w") as f:
+            json.dump(history, f, ensure_ascii=False, separators=(",", ":"))
+    else:
+        baseline = previous
+
+    for player in standings["standings"]:
+        before = baseline.get(player["player_id"])
+        player["position_change"] = before[1] - player["position"] if before else None
+        player["points_change"] = player["total_points"] - before[0] if before else None
+    standings["snapshot"] = snapshots[-1]["seq"] if snapshots else None
+    return snapshot
+
+
+def write_standings(data_dir: str, schedule_file: str) -> None:
+    """Rebuild standings from the event JSONs and write data_dir/standings.json.
+
+    Also appends a snapshot to the standings history when anything changed.
+    """
+    standings = update_standings(data_dir, load_schedule(schedule_file))
+    snapshot = record_standings_snapshot(data_dir, standings)
+    if snapshot:
+        print(f"Recorded standings snapshot {snapshot['seq']} ({len(snapshot['changes'])} players changed)")
+    standings_file = Path(data_dir) / "standings.json"
+    with open(standings_file, "w") as f:
+        json.dump(standings, f, indent=2)
+    print(f"Updated standings at {standings_file}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Process Chess-Results crosstables")
-    parser.add_argument("xlsx_file", help="Path to the crosstable Excel file")
+    parser.add_argument("crosstable_file", help="Path to the crosstable file (.xlsx, .trf/.txt or .csv)")
     parser.add_argument("event_type", choices=["rapid", "group_a", "group_b", "group_c"],
                         help="Type of event")
     parser.add_argument("--output-dir", default="data", help="Output directory for JSON files")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Write the event JSON in the compact columnar (v2) layout")
+    parser.add_argument("--ratings-db",
+                        help="Local FIDE rating list store (see fide_ratings.py) for titles, list ratings and seeding unrated players")
+    parser.add_argument("--schedule", default="crosstables/events.json",
+                        help="Events config with the upcoming schedule for clinch/elimination analysis")
     
     args = parser.parse_args()
     
     # Process the event
-    event_data = process_event(args.xlsx_file, args.event_type)
+    ratings = None
+    if args.ratings_db:
+        from fide_ratings import RatingStore
+        ratings = RatingStore(args.ratings_db)
+    event_data = process_event(args.crosstable_file, args.event_type, columnar=args.columnar, ratings=ratings)
+    if ratings is not None:
+        ratings.close()
     
     # Ensure output directories exist
     output_dir = Path(args.output_dir)
@@ -525,15 +1493,18 @@ def main():
     # Save event data
     event_file = events_dir / f"{event_data['event_id']}.json"
     with open(event_file, "w") as f:
-        json.dump(event_data, f, indent=2)
+        if args.columnar:
+            json.dump(event_data, f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(event_data, f, indent=2)
     print(f"Saved event data to {event_file}")
+
+    # Merge the event's games into the head-to-head shards
+    games = update_head_to_head(args.output_dir, event_data)
+    print(f"Stored {games} games in {output_dir / HEAD_TO_HEAD_DIR}")
     
     # Update overall standings
-    standings = update_standings(args.output_dir)
-    standings_file = output_dir / "standings.json"
-    with open(standings_file, "w") as f:
-        json.dump(standings, f, indent=2)
-    print(f"Updated standings at {standings_file}")
+    write_standings(args.output_dir, args.schedule)
 
 
 if __name__ == "__main__":
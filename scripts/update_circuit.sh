@@ -5,8 +5,12 @@
 # Usage:
 #   ./scripts/update_circuit.sh                              # Process all events from events.json
 #   ./scripts/update_circuit.sh add <file.xlsx> <type> [name] # Add new event, register in events.json, process & generate page
+#                                                            (.trf/.txt FIDE TRF and .csv crosstables work too)
 #   ./scripts/update_circuit.sh standings                     # Refresh standings only (no Excel reprocessing)
 #
+# Set COLUMNAR=1 to write event JSON in the compact columnar (v2) layout.
+# Set RATINGS_DB=ratings/fide_ratings.sqlite3 to match players against the local FIDE rating list.
+#
 # Event types: rapid, group_a, group_b, group_c
 #
 # Examples:
@@ -69,6 +73,10 @@ if name:
     entry["name"] = name
 config.setdefault("events", []).append(entry)
 
+# Once played, an event is no longer part of the upcoming schedule
+if name and "upcoming" in config:
+    config["upcoming"] = [u for u in config["upcoming"] if u.get("name") != name]
+
 with open(config_file, "w") as f:
     json.dump(config, f, indent=2)
     f.write("\n")
@@ -91,9 +99,10 @@ process_event() {
     fi
 
     local event_id
-    event_id=$(basename "$file" .xlsx)
+    event_id=$(basename "$file")
+    event_id="${event_id%.*}"
     echo "  - Processing: ${name:-$event_id} ($event_type)"
-    python scripts/process_crosstable.py "$file" "$event_type"
+    python scripts/process_crosstable.py "$file" "$event_type" ${COLUMNAR:+--columnar} ${RATINGS_DB:+--ratings-db "$RATINGS_DB"}
     python scripts/generate_event_page.py "$event_id"
 }
 
@@ -148,107 +157,16 @@ cmd_add() {
 # ──────────────────────────────────────────────
 cmd_standings() {
     echo "Refreshing standings from existing event data..."
-    python3 << 'PYEOF'
-import json, re
-from datetime import datetime
-from pathlib import Path
-
-def get_event_category(event_type):
-    return "rapid" if event_type == "rapid" else "classical"
-
-def normalize_player_key(name):
-    return re.sub(r"\s+", " ", name.replace(",", " ").strip().lower())
-
-def calculate_best_n_points(events, max_events=3):
-    sorted_events = sorted(events, key=lambda x: -x["points"])
-    events_with_status = []
-    total = 0
-    for i, event in enumerate(sorted_events):
-        counted = i < max_events
-        events_with_status.append({**event, "counted": counted})
-        if counted:
-            total += event["points"]
-    return total, events_with_status
-
-data_dir = Path("data")
-events_dir = data_dir / "events"
-if not events_dir.exists():
-    print("No events directory found.")
-    exit(1)
-
-all_events = []
-player_data = {}
-
-for event_file in sorted(events_dir.glob("*.json")):
-    with open(event_file) as f:
-        event = json.load(f)
-    event_type = event["event_type"]
-    category = get_event_category(event_type)
-    all_events.append({
-        "event_id": event["event_id"],
-        "event_type": event_type,
-        "category": category,
-        "name": event["tournament"].get("name", event["event_id"]),
-        "date": event["tournament"].get("date", ""),
-        "total_players": event["total_players"],
-    })
-    for result in event["results"]:
-        name = result["name"]
-        key = normalize_player_key(name)
-        if key not in player_data:
-            player_data[key] = {
-                "name": name, "title": result.get("title", ""),
-                "rating": result.get("rating", 0), "federation": result.get("federation", ""),
-                "rapid_events": [], "classical_events": [],
-            }
-        else:
-            if "," in name and "," not in player_data[key]["name"]:
-                player_data[key]["name"] = name
-        if result.get("rating", 0) > player_data[key]["rating"]:
-            player_data[key]["rating"] = result["rating"]
-        if result.get("title") and not player_data[key]["title"]:
-            player_data[key]["title"] = result["title"]
-        entry = {
-            "event_id": event["event_id"], "event_type": event_type,
-            "category": category, "final_rank": result["final_rank"],
-            "points": result["circuit_points"]["total"],
-        }
-        if category == "rapid":
-            player_data[key]["rapid_events"].append(entry)
-        else:
-            player_data[key]["classical_events"].append(entry)
-
-standings = []
-for data in player_data.values():
-    rapid_total, rapid_events = calculate_best_n_points(data["rapid_events"])
-    classical_total, classical_events = calculate_best_n_points(data["classical_events"])
-    all_player_events = rapid_events + classical_events
-    counted_events = [e for e in all_player_events if e.get("counted", True)]
-    standings.append({
-        "name": data["name"], "title": data["title"],
-        "rating": data["rating"], "federation": data["federation"],
-        "events": all_player_events,
-        "rapid_points": rapid_total, "classical_points": classical_total,
-        "total_points": rapid_total + classical_total,
-        "events_counted": len(counted_events),
-        "events_total": len(all_player_events),
-    })
-
-standings.sort(key=lambda x: -x["total_points"])
-for i, player in enumerate(standings, 1):
-    player["position"] = i
-
-result = {
-    "standings": standings,
-    "events": sorted(all_events, key=lambda x: x.get("date", ""), reverse=True),
-    "updated_at": datetime.now().isoformat(),
-}
-
-out = data_dir / "standings.json"
-with open(out, "w") as f:
-    json.dump(result, f, indent=2)
-print(f"Updated {out}")
-PYEOF
+    if [ ! -d "data/events" ]; then
+        echo "No events directory found."
+        exit 1
+    fi
+    python3 -c "
+import sys
+sys.path.insert(0, '${SCRIPT_DIR}')
+from process_crosstable import write_standings
+write_standings('data', '${CONFIG_FILE}')
+"
 
     echo ""
     echo "Done! Standings refreshed."
@@ -304,7 +222,9 @@ for event in events:
 
     try:
         subprocess.run(
-            ["python", "scripts/process_crosstable.py", file_path, event_type],
+            ["python", "scripts/process_crosstable.py", file_path, event_type]
+            + (["--columnar"] if os.environ.get("COLUMNAR") else [])
+            + (["--ratings-db", os.environ["RATINGS_DB"]] if os.environ.get("RATINGS_DB") else []),
             check=True,
             capture_output=True
         )
@@ -343,11 +263,13 @@ USAGE
 
 COMMANDS
   (no command)                                Process all events registered in crosstables/events.json.
-                                              Reprocesses every .xlsx file and regenerates all pages + standings.
+                                              Reprocesses every crosstable and regenerates all pages + standings.
 
   add <file.xlsx> <type> [name]               Add a new event to the circuit. This does three things:
                                                 1. Registers the event in crosstables/events.json
-                                                2. Processes the .xlsx crosstable into data/events/<id>.json
+                                                2. Processes the crosstable into data/events/<id>.json
+                                              The crosstable can be a Chess-Results .xlsx export, a FIDE
+                                              TRF file (.trf/.txt) from the pairing software, or a .csv.
                                                 3. Generates the HTML page at site/events/<id>.html
                                               If the event is already registered, it skips step 1 and reprocesses.
 
@@ -357,6 +279,15 @@ COMMANDS
 
   help, --help, -h                            Show this help message.
 
+ENVIRONMENT
+  COLUMNAR=1                                  Write data/events/<id>.json in the columnar v2 layout
+                                              (one array per field, dictionary-encoded strings).
+                                              Much smaller for large opens; app.js reads both layouts.
+  RATINGS_DB=<path>                           Local FIDE rating list store built by scripts/fide_ratings.py.
+                                              Players with a crosstable FIDE ID get missing titles and the
+                                              current list rating (list_rating); unrated ones are seeded by it.
+                                              Name-only matches are stored as fide_id_guess.
+
 EVENT TYPES
   rapid       Open Rapid tournament (Swiss). Percentile-based placement points (max 70).
   group_a     Classical Finals Round Robin (6 players). Fixed placement points (max 125).
@@ -380,10 +311,10 @@ EXAMPLES
   ./scripts/update_circuit.sh standings
 
 DATA FLOW
-  crosstables/*.xlsx                          Source files exported from chess-results.com
+  crosstables/*.xlsx|trf|csv                  Source files (chess-results.com, pairing software TRF, CSV)
         |
         v
-  [process_crosstable.py]                     Parses Excel, calculates circuit points
+  [process_crosstable.py]                     Parses crosstable, calculates circuit points
         |
         v
   data/events/<event_id>.json                 Structured event results + points
@@ -399,6 +330,9 @@ DATA FLOW
 FILES
   crosstables/events.json                     Registry of all events to process. Managed automatically
                                               by the 'add' command; can also be edited by hand.
+                                              Optional "upcoming" (list of {"type", "name"}) and
+                                              "qualification_spots" keys enable the clinch/elimination
+                                              analysis in standings.json.
   data/standings.json                         Overall circuit standings. Regenerated on every run.
   site/                                       Static site root. Serve with any web server or deploy to Netlify.
 HELPTEXT
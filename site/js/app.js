@@ -50,6 +50,19 @@ function formatPosition(pos) {
     return pos;
 }
 
+// Rank movement since the previous standings snapshot
+function formatMovement(player, snapshot) {
+    const change = player.position_change;
+    if (change === undefined) return '';
+    if (change === null) {
+        return snapshot > 1 ? '<span class="badge badge-info badge-xs">NEW</span>' : '';
+    }
+    const pts = player.points_change ? ` (${player.points_change > 0 ? '+' : ''}${player.points_change} pts)` : '';
+    if (change > 0) return `<span class="text-success text-xs" title="Up ${change}${pts}">&#9650;${change}</span>`;
+    if (change < 0) return `<span class="text-error text-xs" title="Down ${-change}${pts}">&#9660;${-change}</span>`;
+    return '<span class="text-base-content/30 text-xs" title="No change">&ndash;</span>';
+}
+
 // Format date
 function formatDate(dateStr) {
     if (!dateStr) return '';
@@ -67,6 +80,17 @@ function formatRating(rating) {
     return rating;
 }
 
+// FIDE list rating (events processed with --ratings-db), linked to the FIDE profile
+function formatListRating(player) {
+    if (!player.list_rating) return '';
+    const label = `FIDE ${player.list_rating}`;
+    const link = player.fide_id
+        ? `<a class="link link-hover" href="https://ratings.fide.com/profile/${player.fide_id}" target="_blank" rel="noopener">${label}</a>`
+        : label;
+    const source = player.rating_source === 'list' ? ' title="Unrated in the crosstable, seeded by the FIDE list"' : '';
+    return `<div class="text-xs text-base-content/50"${source}>${link}</div>`;
+}
+
 // Load JSON data (no-store to avoid stale standings/event data after updates)
 async function loadJSON(path) {
     try {
@@ -117,6 +141,24 @@ function formatEventsCount(player) {
     return `<span class="badge badge-ghost" title="${counted} of ${total} events counted">${counted}/${total}</span>`;
 }
 
+// Format clinch/elimination status from the race analysis (absent when no schedule is configured)
+function formatRaceStatus(player) {
+    const race = player.race;
+    if (!race) return '';
+    if (race.status === 'clinched') {
+        return '<span class="badge badge-success badge-sm" title="Qualification spot clinched">Clinched</span>';
+    }
+    if (race.status === 'eliminated') {
+        return `<span class="badge badge-ghost badge-sm opacity-60" title="Max possible: ${race.max_points} pts">Eliminated</span>`;
+    }
+    const tips = [`Max possible: ${race.max_points} pts`];
+    if (race.points_to_overtake > 0) tips.push(`${race.points_to_overtake} pts to overtake #${player.position - 1}`);
+    if (race.points_to_clinch) tips.push(`${race.points_to_clinch} pts to clinch`);
+    else tips.push('Cannot clinch on own results');
+    if (!race.can_catch_leader) tips.push('Cannot catch the leader');
+    return `<span class="badge badge-outline badge-sm" title="${tips.join(' &middot; ')}">${race.points_to_clinch ? `${race.points_to_clinch} to clinch` : 'In contention'}</span>`;
+}
+
 // Render standings table
 function renderStandings(data) {
     const tbody = document.getElementById('standings-body');
@@ -133,14 +175,20 @@ function renderStandings(data) {
 
     tbody.innerHTML = data.standings.map(player => `
         <tr class="hover">
-            <td class="text-center font-bold">${formatPosition(player.position)}</td>
+            <td class="text-center font-bold">
+                ${formatPosition(player.position)}
+                <div>${formatMovement(player, data.snapshot)}</div>
+            </td>
             <td>
                 <div class="flex items-center gap-2">
                     ${formatTitle(player.title)}
-                    <span class="font-medium">${player.name}</span>
+                    ${player.player_id
+                        ? `<a class="font-medium link link-hover" onclick="showHeadToHead('${player.player_id}')">${player.name}</a>`
+                        : `<span class="font-medium">${player.name}</span>`}
+                    ${formatRaceStatus(player)}
                 </div>
             </td>
-            <td class="text-center">${formatRating(player.rating)}</td>
+            <td class="text-center">${formatRating(player.rating)}${formatListRating(player)}</td>
             <td class="text-center">
                 ${formatEventsCount(player)}
             </td>
@@ -154,6 +202,90 @@ function renderStandings(data) {
     `).join('');
 }
 
+// Head-to-head shards are fetched on demand, one small JSON per player
+const headToHeadCache = {};
+
+async function loadHeadToHead(playerId) {
+    if (!(playerId in headToHeadCache)) {
+        headToHeadCache[playerId] = await loadJSON(`${DATA_PATH}/head_to_head/${encodeURIComponent(playerId)}.json`);
+    }
+    return headToHeadCache[playerId];
+}
+
+// Get (or create) the head-to-head modal
+function getHeadToHeadModal() {
+    let modal = document.getElementById('h2h-modal');
+    if (!modal) {
+        modal = document.createElement('dialog');
+        modal.id = 'h2h-modal';
+        modal.className = 'modal';
+        modal.innerHTML = `
+            <div class="modal-box max-w-2xl">
+                <h3 class="font-bold text-lg mb-4" id="h2h-title"></h3>
+                <div id="h2h-body"></div>
+                <div class="modal-action">
+                    <form method="dialog"><button class="btn">Close</button></form>
+                </div>
+            </div>
+            <form method="dialog" class="modal-backdrop"><button>close</button></form>
+        `;
+        document.body.appendChild(modal);
+    }
+    return modal;
+}
+
+// Render a player's record against every opponent they have faced
+function renderHeadToHead(shard) {
+    const opponents = Object.values(shard.opponents)
+        .sort((a, b) => b.games.length - a.games.length || a.name.localeCompare(b.name));
+    return `
+        <div class="overflow-x-auto">
+            <table class="table table-sm">
+                <thead>
+                    <tr>
+                        <th>Opponent</th>
+                        <th class="text-center">+</th>
+                        <th class="text-center">=</th>
+                        <th class="text-center">-</th>
+                        <th class="text-center">W / B</th>
+                        <th class="text-center">Score</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    ${opponents.map(o => `
+                        <tr class="hover">
+                            <td>${o.name}</td>
+                            <td class="text-center text-success">${o.w}</td>
+                            <td class="text-center">${o.d}</td>
+                            <td class="text-center text-error">${o.l}</td>
+                            <td class="text-center text-sm">${o.white} / ${o.black}</td>
+                            <td class="text-center font-bold">${o.w + o.d / 2}/${o.games.length}</td>
+                        </tr>
+                    `).join('')}
+                </tbody>
+            </table>
+        </div>
+    `;
+}
+
+// Open the head-to-head modal for a player
+async function showHeadToHead(playerId) {
+    const modal = getHeadToHeadModal();
+    const title = document.getElementById('h2h-title');
+    const body = document.getElementById('h2h-body');
+    title.textContent = 'Head-to-head';
+    body.innerHTML = '<span class="loading loading-spinner"></span>';
+    modal.showModal();
+
+    const shard = await loadHeadToHead(playerId);
+    if (!shard) {
+        body.innerHTML = '<p class="text-base-content/50">No games recorded for this player yet.</p>';
+        return;
+    }
+    title.textContent = `${shard.name} - Head-to-head`;
+    body.innerHTML = renderHeadToHead(shard);
+}
+
 // Render events navigation
 function renderEventsNav(events) {
     const nav = document.getElementById('nav-events');
@@ -244,8 +376,43 @@ function isPlayerEligible(player) {
     return cp.eligible !== false; // Default to true if not specified
 }
 
+// Decode a columnar (schema_version 2) event into the row layout; v1 events pass through
+function decodeEventColumns(data) {
+    if (!data || data.schema_version !== 2) return data;
+
+    const dicts = data.dictionaries || {};
+    const decodeColumn = (field, column) => {
+        const entries = dicts[field];
+        return entries ? column.map(v => (v === null ? null : entries[v])) : column;
+    };
+
+    const { circuit_points: pointColumns, rounds: roundColumns, ...fieldColumns } = data.columns;
+    const fields = Object.keys(fieldColumns).map(f => [f, decodeColumn(f, fieldColumns[f])]);
+    const pointFields = Object.keys(pointColumns).map(f => [f, decodeColumn(f, pointColumns[f])]);
+    const names = fieldColumns.name;
+
+    const results = new Array(data.total_players);
+    for (let i = 0; i < data.total_players; i++) {
+        const row = {};
+        for (const [f, col] of fields) row[f] = col[i];
+        row.circuit_points = {};
+        for (const [f, col] of pointFields) row.circuit_points[f] = col[i];
+        if (roundColumns) {
+            row.rounds = roundColumns[i].map(([round, opp, color, result]) => ({
+                round, opponent: opp === null ? null : names[opp], color, result
+            }));
+        }
+        results[i] = row;
+    }
+
+    const { columns, dictionaries, schema_version, ...rest } = data;
+    return { ...rest, results };
+}
+
 // Render event results page
 function renderEventResults(data) {
+    data = decodeEventColumns(data);
+
     // Update page title
     document.title = `${data.tournament.name} - Keshmat Circuit 2026`;
 
@@ -284,7 +451,7 @@ function renderEventResults(data) {
                             ${ineligibleBadge}
                         </div>
                     </td>
-                    <td class="text-center">${formatRating(player.rating)}</td>
+                    <td class="text-center">${formatRating(player.rating)}${formatListRating(player)}</td>
                     <td class="text-center font-medium">${player.points}</td>
                     <td class="text-center">
                         <span class="badge badge-sm ${!eligible ? 'badge-error' : 'badge-ghost'}">${formatRoundsPlayed(player)}</span>